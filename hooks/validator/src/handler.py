@@ -1,69 +1,127 @@
 from __future__ import annotations
 
-import json
-import os
-from typing import Any, Dict
+# typing is only needed by type checkers; skipping the import keeps it off the cold-start path
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Callable
+
+    _Validator = Callable[[dict[str, Any], dict[str, str]], dict[str, Any]]
 
 ALLOWED_RUNTIME = {"python3.12"}
 MAX_TIMEOUT = 30
 MAX_MEMORY = 1024
-REQUIRED_TAGS = {"toolset_id", "owner", "env"}
+REQUIRED_TAGS = frozenset({"toolset_id", "owner", "env"})
 STACK_TAG_GATE_KEY = "toolforest-tools"
 STACK_TAG_GATE_VALUE = "1"
 
+# Computed once per container instead of on every invocation
+_ALLOWED_RUNTIMES_TUPLE = tuple(sorted(ALLOWED_RUNTIME))
+_RUNTIME_MSG_SUFFIX = f" not allowed; must be one of {list(_ALLOWED_RUNTIMES_TUPLE)}"
+# Shared response for every SUCCESS path; the hooks framework only serializes it. A plain
+# dict (not a MappingProxyType) because the Lambda runtime JSON-encodes the return value.
+_SUCCESS: dict[str, Any] = {"status": "SUCCESS", "message": "ok"}
+
+
+def _compile_lambda_validator() -> _Validator:
+    """Build the AWS::Lambda::Function validator once at import.
+
+    The limits are bound as default arguments so the checks read fast locals
+    instead of module globals on every invocation.
+    """
+
+    def validate(
+        resource_props: dict[str, Any],
+        _stack_tags: dict[str, str],
+        # With a single allowed runtime, tuple membership is one identity/equality compare
+        _allowed_runtime: tuple[str, ...] = _ALLOWED_RUNTIMES_TUPLE,
+        _max_timeout: int = MAX_TIMEOUT,
+        _max_memory: int = MAX_MEMORY,
+        _required_tags: frozenset[str] = REQUIRED_TAGS,
+        _n_required: int = len(REQUIRED_TAGS),
+        _runtime_msg_suffix: str = _RUNTIME_MSG_SUFFIX,
+        _success: dict[str, Any] = _SUCCESS,
+    ) -> dict[str, Any]:
+        props_get = resource_props.get
+        runtime = props_get("Runtime")
+        if runtime not in _allowed_runtime:
+            return {"status": "FAILURE", "message": f"Runtime {runtime}" + _runtime_msg_suffix}
+        # Hook payloads usually carry ints already; only coerce when they don't
+        timeout = props_get("Timeout", 0)
+        if type(timeout) is not int:
+            try:
+                timeout = int(timeout)
+            except (TypeError, ValueError):
+                return {"status": "FAILURE", "message": f"Invalid Timeout: {timeout}"}
+        memory = props_get("MemorySize", 0)
+        if type(memory) is not int:
+            try:
+                memory = int(memory)
+            except (TypeError, ValueError):
+                return {"status": "FAILURE", "message": f"Invalid MemorySize: {memory}"}
+        if timeout > _max_timeout:
+            return {"status": "FAILURE", "message": f"Timeout {timeout}s exceeds max {_max_timeout}s"}
+        if memory > _max_memory:
+            return {"status": "FAILURE", "message": f"Memory {memory}MB exceeds max {_max_memory}MB"}
+        # Tags can be list of {Key,Value}; only key membership matters, so collect
+        # required keys in one pass and stop once all are seen
+        seen = set()
+        for t in props_get("Tags", []) or []:
+            if type(t) is dict:
+                key = t.get("Key")
+                if key in _required_tags:
+                    seen.add(key)
+                    if len(seen) == _n_required:
+                        return _success
+        missing = sorted(_required_tags - seen)
+        if missing:
+            return {"status": "FAILURE", "message": f"Missing required tags: {missing}"}
+        return _success
+
+    return validate
 
-def _success() -> Dict[str, Any]:
-    return {"status": "SUCCESS", "message": "ok"}
 
+def _validate_alias(resource_props: dict[str, Any], stack_tags: dict[str, str]) -> dict[str, Any]:
+    alias_name = resource_props.get("Name")
+    env = stack_tags.get("env")
+    if env and alias_name != env:
+        return {"status": "FAILURE", "message": f"Alias name {alias_name} must equal env {env}"}
+    return _SUCCESS
 
-def _failure(msg: str) -> Dict[str, Any]:
-    return {"status": "FAILURE", "message": msg}
 
+def _validate_iam(_resource_props: dict[str, Any], _stack_tags: dict[str, str]) -> dict[str, Any]:
+    # Placeholder for IAM validations as needed
+    return _SUCCESS
 
-def handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
+
+def _pass_through(_resource_props: dict[str, Any], _stack_tags: dict[str, str]) -> dict[str, Any]:
+    # Unhandled resource types pass
+    return _SUCCESS
+
+
+# Resource type -> validator, resolved with a single hashed lookup per invocation
+_DISPATCH: dict[str, _Validator] = {
+    "AWS::Lambda::Function": _compile_lambda_validator(),
+    "AWS::Lambda::Alias": _validate_alias,
+    "AWS::IAM::Role": _validate_iam,
+}
+
+
+def handler(event: dict[str, Any], _context: Any) -> dict[str, Any]:
     # CloudFormation Hook-style event (simplified expectations)
-    # Fall back to SUCCESS if format differs; hooks framework will surface issues during registration/testing
+    # Stacks without the gating tag pass untouched; a malformed event on a gated stack fails closed
     try:
-        hook_context = event.get("hookContext", {})
-        target_name = hook_context.get("targetName")  # e.g., AWS::Lambda::Function
-        stack_tags: Dict[str, str] = hook_context.get("stackTags", {})
-        request_data = event.get("requestData", {})
-        resource_props: Dict[str, Any] = request_data.get("resourceProperties", {})
-        # Only enforce if stack has the gating tag
+        hook_context = event.get("hookContext") or {}
+        ctx_get = hook_context.get
+        stack_tags: dict[str, str] = ctx_get("stackTags") or {}
+        # Only enforce if stack has the gating tag; checked before touching the rest of the event
         if stack_tags.get(STACK_TAG_GATE_KEY) != STACK_TAG_GATE_VALUE:
-            return _success()
-
-        if target_name == "AWS::Lambda::Function":
-            runtime = resource_props.get("Runtime")
-            if runtime not in ALLOWED_RUNTIME:
-                return _failure(f"Runtime {runtime} not allowed; must be one of {sorted(ALLOWED_RUNTIME)}")
-            timeout = int(resource_props.get("Timeout", 0))
-            memory = int(resource_props.get("MemorySize", 0))
-            if timeout > MAX_TIMEOUT:
-                return _failure(f"Timeout {timeout}s exceeds max {MAX_TIMEOUT}s")
-            if memory > MAX_MEMORY:
-                return _failure(f"Memory {memory}MB exceeds max {MAX_MEMORY}MB")
-            # Tags check (Tags can be list of {Key,Value})
-            tags_list = resource_props.get("Tags", []) or []
-            present = {t.get("Key"): t.get("Value") for t in tags_list if isinstance(t, dict)}
-            missing = [t for t in REQUIRED_TAGS if t not in present]
-            if missing:
-                return _failure(f"Missing required tags: {missing}")
-            return _success()
-
-        if target_name == "AWS::Lambda::Alias":
-            alias_name = resource_props.get("Name")
-            env = stack_tags.get("env")
-            if env and alias_name != env:
-                return _failure(f"Alias name {alias_name} must equal env {env}")
-            return _success()
-
-        if target_name == "AWS::IAM::Role":
-            # Placeholder for IAM validations as needed
-            return _success()
-
-        # Unhandled resource types pass
-        return _success()
+            return _SUCCESS
+
+        target_name = ctx_get("targetName")  # e.g., AWS::Lambda::Function
+        resource_props: dict[str, Any] = (event.get("requestData") or {}).get("resourceProperties") or {}
+        validator = _DISPATCH.get(target_name, _pass_through) if isinstance(target_name, str) else _pass_through
+        return validator(resource_props, stack_tags)
 
     except Exception as exc:  # noqa: BLE001
-        return _failure(f"Unhandled error: {exc}")
+        # Malformed payloads (non-dict sections, non-iterable Tags) fail closed instead of crashing
+        return {"status": "FAILURE", "message": f"Unhandled error: {exc}"}
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "rules"
+
+
+@pytest.mark.skipif(shutil.which("cfn-guard") is None, reason="cfn-guard CLI not installed")
+def test_guard_rules_match_fixtures():
+    result = subprocess.run(
+        [
+            "cfn-guard", "test",
+            "--rules-file", str(RULES_DIR / "toolforest_lambda.guard"),
+            "--test-data", str(RULES_DIR / "tests" / "toolforest_lambda_tests.yaml"),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
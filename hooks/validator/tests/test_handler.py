@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from hooks.validator.src.handler import handler
+
+GATED_TAGS = {"toolforest-tools": "1", "env": "dev"}
+VALID_FUNCTION = {
+    "Runtime": "python3.12",
+    "Timeout": 15,
+    "MemorySize": 256,
+    "Tags": [
+        {"Key": "toolset_id", "Value": "abc"},
+        {"Key": "owner", "Value": "me@example.com"},
+        {"Key": "env", "Value": "dev"},
+    ],
+}
+
+
+def _event(target: str, props: Any, stack_tags: Any = GATED_TAGS) -> Dict[str, Any]:
+    return {
+        "hookContext": {"targetName": target, "stackTags": stack_tags},
+        "requestData": {"resourceProperties": props},
+    }
+
+
+def test_valid_function_passes():
+    assert handler(_event("AWS::Lambda::Function", VALID_FUNCTION), None)["status"] == "SUCCESS"
+
+
+def test_ungated_stack_is_not_enforced():
+    props = {**VALID_FUNCTION, "Runtime": "nodejs20.x"}
+    assert handler(_event("AWS::Lambda::Function", props, {"env": "dev"}), None)["status"] == "SUCCESS"
+
+
+def test_function_limits_fail():
+    for override in ({"Runtime": "python3.9"}, {"Timeout": 60}, {"MemorySize": 4096}, {"Timeout": "abc"}):
+        resp = handler(_event("AWS::Lambda::Function", {**VALID_FUNCTION, **override}), None)
+        assert resp["status"] == "FAILURE", override
+
+
+def test_missing_required_tags_fail():
+    props = {**VALID_FUNCTION, "Tags": [{"Key": "env", "Value": "dev"}]}
+    resp = handler(_event("AWS::Lambda::Function", props), None)
+    assert resp["status"] == "FAILURE"
+    assert "owner" in resp["message"] and "toolset_id" in resp["message"]
+
+
+def test_alias_must_match_env():
+    assert handler(_event("AWS::Lambda::Alias", {"Name": "dev"}), None)["status"] == "SUCCESS"
+    assert handler(_event("AWS::Lambda::Alias", {"Name": "prod"}), None)["status"] == "FAILURE"
+
+
+def test_malformed_input_fails_closed():
+    events = [
+        _event("AWS::Lambda::Function", {**VALID_FUNCTION, "Tags": 5}),
+        _event("AWS::Lambda::Function", VALID_FUNCTION, stack_tags=[["toolforest-tools", "1"]]),
+        _event("AWS::Lambda::Function", "not-a-dict"),
+        {"hookContext": "not-a-dict"},
+    ]
+    for event in events:
+        assert handler(event, None)["status"] == "FAILURE"
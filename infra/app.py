@@ -17,6 +17,8 @@ owner = os.getenv("OWNER", "gerrit@toolforest.io")
 region = os.getenv("CDK_DEFAULT_REGION", "us-west-2")
 account = os.getenv("CDK_DEFAULT_ACCOUNT")
 
+# Toolset stacks are independent of each other, so deploys run them in parallel
+# (`cdk deploy --all --concurrency N` in scripts/deploy.sh and the pipeline buildspecs)
 build_toolset_stacks(app=app, env_name=env_name, default_tags={"owner": owner, "env": env_name})
 
 # Optionally synth pipelines if connection/repo info is set
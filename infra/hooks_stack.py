@@ -3,7 +3,9 @@ from __future__ import annotations
 import aws_cdk as cdk
 from aws_cdk import (
     Stack,
+    aws_iam as iam,
     aws_lambda as _lambda,
+    aws_s3_assets as s3_assets,
 )
 from constructs import Construct
 
@@ -17,9 +19,51 @@ class HooksStack(Stack):
             "HookValidator",
             runtime=_lambda.Runtime.PYTHON_3_12,
             handler="handler.handler",
-            code=_lambda.Code.from_asset("hooks/validator/src"),
+            # Ship only handler.py: local bytecode caches would otherwise change the source hash
+            # (forcing a re-upload and new version) and pad the zip fetched on cold start
+            code=_lambda.Code.from_asset("hooks/validator/src", exclude=["__pycache__", "*.pyc"]),
             function_name="toolforest-cfn-hook-validator",
             description="Validates toolforest toolset stacks; no-ops unless stack tag toolforest-tools=1",
+            # Hook calls are sporadic, so most would otherwise pay a full interpreter cold start
+            snap_start=_lambda.SnapStartConf.ON_PUBLISHED_VERSIONS,
         )
+        # SnapStart only applies to published versions; register the hook against this alias
+        live_alias = _lambda.Alias(self, "HookValidatorLive", alias_name="live", version=validator.current_version)
 
-        cdk.CfnOutput(self, "ValidatorArn", value=validator.function_arn)
+        # Kept for the manual hook registration step; not exported, so no cross-stack export wiring
+        cdk.CfnOutput(
+            self,
+            "ValidatorArn",
+            value=live_alias.function_arn,
+            description="Lambda ARN to register as the CloudFormation hook handler",
+        )
+
+        # Static Lambda limits (runtime, timeout, memory, required tags) evaluated declaratively by
+        # CloudFormation's Guard engine, without invoking the validator Lambda
+        guard_rules = s3_assets.Asset(self, "LambdaLimitsGuardRules", path="hooks/validator/rules/toolforest_lambda.guard")
+        guard_role = iam.Role(
+            self,
+            "GuardHookRole",
+            assumed_by=iam.ServicePrincipal("hooks.cloudformation.amazonaws.com"),
+        )
+        guard_rules.grant_read(guard_role)
+
+        cdk.CfnResource(
+            self,
+            "LambdaLimitsGuardHook",
+            type="AWS::CloudFormation::GuardHook",
+            properties={
+                "Alias": "Toolforest::Hooks::LambdaLimits",
+                "ExecutionRole": guard_role.role_arn,
+                "FailureMode": "FAIL",
+                "HookStatus": "ENABLED",
+                "RuleLocation": {"Uri": guard_rules.s3_object_url},
+                "TargetOperations": ["RESOURCE"],
+                "TargetFilters": {
+                    "Targets": [
+                        {"TargetName": "AWS::Lambda::Function", "Action": action, "InvocationPoint": "PRE_PROVISION"}
+                        for action in ("CREATE", "UPDATE")
+                    ]
+                },
+            },
+        )
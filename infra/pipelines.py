@@ -14,6 +14,182 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+# uv resolves and downloads in parallel; its content-addressed cache (the wheelhouse) lives in
+# the S3 project cache so warm runs install from local wheels
+_UV_CACHE_DIR = ".uv-cache"
+_UV_CACHE = {"paths": [f"{_UV_CACHE_DIR}/**/*"]}
+_UV_ENV = {"UV_CACHE_DIR": _UV_CACHE_DIR}
+# Standalone installer (as in pipeline/buildspecs) rather than pip-installing uv into the image's Python.
+# Only Test needs it: the Build/Deploy image (pipeline/images/cdk) ships uv preinstalled.
+_UV_BOOTSTRAP = [
+    "curl -LsSf https://astral.sh/uv/install.sh | sh",
+    "export PATH=$HOME/.local/bin:$PATH",
+]
+# The requirements-only venv is keyed on the requirements hash plus arch (Test runs on Graviton)
+# and the exact interpreter it was built against (patch version and path, since the venv links
+# back to it), and kept in the shared cache bucket: a hit is a single download and untar instead
+# of a resolve and install. A restored venv whose interpreter no longer runs (image updated under
+# the same key) is discarded and rebuilt. Relocatable, because CODEBUILD_SRC_DIR differs between
+# builds. The client adapter is installed on top afterwards and never lands in the cached tarball.
+# UV_INSTALL_ARGS is empty except in Deploy, which installs offline from the Build stage's wheelhouse.
+_INSTALL_REQUIREMENTS = [
+    "PY_BIN=$(uv python find 3.12 2>/dev/null || { uv python install 3.12 >/dev/null && uv python find 3.12; }); "
+    "PY_VER=$(\"$PY_BIN\" -c 'import sys;print(sys.version.split()[0])'); "
+    "if [ -z \"$PY_VER\" ]; then echo 'No Python 3.12 interpreter available'; exit 1; fi; "
+    "VENV_KEY=\"venv/$ENV/$(uname -m)/py$PY_VER-$(echo \"$PY_BIN\" | sha256sum | cut -c1-12)-$(sha256sum \"$REQ\" | cut -d' ' -f1).tar.gz\"; "
+    "if aws s3 cp --quiet \"s3://$CACHE_BUCKET/$VENV_KEY\" /tmp/venv.tar.gz 2>/dev/null && tar -xzf /tmp/venv.tar.gz && .venv/bin/python -V; then echo \"Restored venv from $VENV_KEY\"; "
+    "else rm -rf .venv && uv venv --python \"$PY_BIN\" --relocatable && uv pip install --python .venv/bin/python $UV_INSTALL_ARGS -r \"$REQ\" && tar -czf /tmp/venv.tar.gz .venv "
+    "&& { aws s3 cp --quiet /tmp/venv.tar.gz \"s3://$CACHE_BUCKET/$VENV_KEY\" || echo 'venv cache upload failed'; }; fi",
+    ". .venv/bin/activate",
+]
+_ADAPTER_TAG = "v0.3.1"
+_ADAPTER_GIT_URL = f"mcp-server-adapter @ git+https://$GITHUB_PAT@github.com/primevalsoup/toolforest_tools_client.git@{_ADAPTER_TAG}"
+# A tag never moves, so its wheel is built from Git once and then fetched from the cache bucket,
+# skipping the clone and build (and the PAT use) on every later run
+_FETCH_PINNED_ADAPTER = (
+    f"ADAPTER_S3=\"s3://$CACHE_BUCKET/wheels/mcp-server-adapter/{_ADAPTER_TAG}/\"; mkdir -p /tmp/adapter-wheel; "
+    "if aws s3 cp --quiet --recursive \"$ADAPTER_S3\" /tmp/adapter-wheel/ 2>/dev/null && ls /tmp/adapter-wheel/*.whl >/dev/null 2>&1; then echo \"Using cached adapter wheel\"; "
+    f"else uvx pip wheel --quiet --no-deps \"{_ADAPTER_GIT_URL}\" -w /tmp/adapter-wheel "
+    "&& { aws s3 cp --quiet --recursive /tmp/adapter-wheel/ \"$ADAPTER_S3\" || echo 'adapter wheel cache upload failed'; }; fi"
+)
+# Client adapter from the branch-aligned ClientSource input (dev/test) when present, else the pinned
+# Git tag; input locations are known at synth time, so nothing scans the source roots
+_FIND_CLIENT = "CLIENT=\"\"; if [ -d \"${CODEBUILD_SRC_DIR_ClientSource:-}/src/mcp_server_adapter\" ]; then CLIENT=\"$CODEBUILD_SRC_DIR_ClientSource\"; fi"
+_INSTALL_CLIENT = f"if [ -n \"$CLIENT\" ]; then echo \"Installing client from $CLIENT\"; uv pip install -e \"$CLIENT\"; else echo \"No client source found; using pinned adapter\"; {{ {_FETCH_PINNED_ADAPTER} && uv pip install /tmp/adapter-wheel/*.whl; }} || true; fi"
+_CHECK_ADAPTER = "python -c \"import mcp_server_adapter; print('mcp_server_adapter OK')\""
+# Toolset code is zipped once per run ahead of synth, so ToolsetStack takes the zips as-is
+_BUNDLE_DIR = "dist"
+_BUNDLE_TOOLSETS = f"python3 scripts/bundle_toolsets.py {_BUNDLE_DIR}"
+_SYNTH = f"TOOLFOREST_BUNDLE_DIR={_BUNDLE_DIR} ENV=$ENV npx cdk synth"
+_REQUIRE_PROD_PAT = "if [ \"$ENV\" = \"prod\" ] && [ -z \"$GITHUB_PAT\" ]; then echo 'GITHUB_PAT required in prod to install private adapter'; exit 1; fi"
+
+
+def _install_commands(source_root: str) -> list[str]:
+    """Install prelude shared by every project: requirements from ``source_root``, then the venv."""
+    return [
+        # Path within the source artifact is fixed at synth time (REQUIREMENTS_PATH)
+        f"REQ=\"{source_root}/$REQUIREMENTS_PATH\"; if [ ! -f \"$REQ\" ]; then echo \"requirements not found at $REQ\"; exit 1; fi; echo Using requirements at $REQ",
+        *_INSTALL_REQUIREMENTS,
+    ]
+
+
+def _buildspec(
+    install: list[str],
+    build: list[str],
+    *,
+    pre_build: list[str] | None = None,
+    post_build: list[str] | None = None,
+    artifacts: bool = True,
+) -> dict:
+    """Buildspec skeleton; the projects differ only in their install extras, later phases and artifacts."""
+    phases: dict = {"install": {"runtime-versions": {"python": "3.12", "nodejs": "20"}, "commands": install}}
+    # post_build runs even after a failed build phase unless earlier phases abort
+    if pre_build:
+        phases["pre_build"] = {"on-failure": "ABORT", "commands": pre_build}
+    phases["build"] = {"on-failure": "ABORT", "commands": build} if post_build else {"commands": build}
+    if post_build:
+        phases["post_build"] = {"commands": post_build}
+    spec: dict = {"version": "0.2", "env": {"variables": _UV_ENV}, "phases": phases}
+    if artifacts:
+        spec["artifacts"] = {"files": ["cdk.out/**"]}
+    spec["cache"] = _UV_CACHE
+    return spec
+
+
+# Buildspecs are env-agnostic (the env comes from the ENV project variable), so they are
+# built once at import and shared by every per-env pipeline stack. Test/Build/Deploy are the
+# staged prod pipeline, split so the manual approval sits between synth and deploy.
+_TEST_BUILDSPEC = _buildspec(
+    [*_UV_BOOTSTRAP, *_install_commands("$CODEBUILD_SRC_DIR"), _FIND_CLIENT, _INSTALL_CLIENT, _CHECK_ADAPTER],
+    [". .venv/bin/activate && pytest -q toolsets hooks"],
+    artifacts=False,
+)
+
+_BUILD_BUILDSPEC = _buildspec(
+    # The private adapter is fetched here (prod needs the PAT) and shipped to Deploy as a wheel
+    [_REQUIRE_PROD_PAT, *_install_commands("$CODEBUILD_SRC_DIR"), _FIND_CLIENT, _INSTALL_CLIENT],
+    [
+        _BUNDLE_TOOLSETS,
+        _SYNTH,
+        # Wheelhouse shipped in SynthOutput so Deploy installs offline (no PyPI or adapter Git clone)
+        "mkdir -p cdk.out/wheels && uvx pip wheel --quiet -r \"$REQ\" -w cdk.out/wheels && if [ -n \"$CLIENT\" ]; then uvx pip wheel --quiet \"$CLIENT\" -w cdk.out/wheels; else uvx pip wheel --quiet /tmp/adapter-wheel/*.whl -w cdk.out/wheels; fi",
+    ],
+)
+
+_DEPLOY_BUILDSPEC = _buildspec(
+    [
+        "UV_INSTALL_ARGS=\"--no-index --find-links $CODEBUILD_SRC_DIR/cdk.out/wheels\"",
+        # Primary input is SynthOutput; the repo arrives as the named Source extra input. Nothing is
+        # synthesized here, so the venv only serves the smoke test.
+        *_install_commands("$CODEBUILD_SRC_DIR_Source"),
+        "SMOKE=\"$CODEBUILD_SRC_DIR_Source/$SMOKE_PATH\"",
+        # Client adapter from the wheel Build made from the pinned Git URL
+        "echo \"Installing client adapter from the Build wheelhouse\"; uv pip install $UV_INSTALL_ARGS mcp-server-adapter",
+        _CHECK_ADAPTER,
+    ],
+    [
+        "if [ ! -f \"$SMOKE\" ]; then echo \"smoke script not found at $SMOKE\"; exit 1; fi; echo Using smoke at $SMOKE",
+        # Deploy the assembly Build synthesized (the primary input) instead of re-running the CDK app
+        "if [ ! -d cdk.out ]; then echo 'cdk.out not found in SynthOutput'; exit 1; fi",
+        "echo Deploy from pre-synthesized templates",
+        "ENV=$ENV OWNER=${OWNER:-pipeline@toolforest.io} npx cdk deploy --app cdk.out --all --concurrency 4 --require-approval never",
+        "echo Smoke test for $ENV",
+        ". .venv/bin/activate && if [ \"$ENV\" = \"prod\" ]; then export MCP_USER_JWT=test-jwt-abc.def.ghijklmnopqrstuvwxyz1234567890abcd; fi; ENV=$ENV python3 \"$SMOKE\"",
+    ],
+)
+
+# dev/test (no approval gate) run everything in one CodeBuild job, paying container start and
+# dependency install once: test, synth, then deploy the synthesized assembly and smoke test it
+_CI_BUILDSPEC = _buildspec(
+    [*_install_commands("$CODEBUILD_SRC_DIR"), _FIND_CLIENT, _INSTALL_CLIENT, _CHECK_ADAPTER],
+    [_BUNDLE_TOOLSETS, _SYNTH],
+    pre_build=[". .venv/bin/activate && pytest -q toolsets hooks"],
+    post_build=[
+        "echo Deploy from pre-synthesized templates",
+        "ENV=$ENV OWNER=${OWNER:-pipeline@toolforest.io} npx cdk deploy --app cdk.out --all --concurrency 4 --require-approval never",
+        "echo Smoke test for $ENV",
+        ". .venv/bin/activate && ENV=$ENV python3 \"$SMOKE_PATH\"",
+    ],
+    artifacts=False,
+)
+
+# Repo paths that can change what the pipeline builds or deploys; pushes touching only other
+# files (docs, spec) never start an execution. Applied on CodeStar connection sources only, the
+# sole provider V2 pipeline triggers support (file-path filters need aws-cdk-lib >= 2.186).
+_TRIGGER_FILE_PATHS = [
+    "infra/**",
+    "hooks/**",
+    "packages/**",
+    "pipeline/**",
+    "scripts/**",
+    "toolsets/**",
+    "requirements.txt",
+    "cdk.json",
+]
+# Docs inside those trees (toolset READMEs, notes) don't affect the build either
+_TRIGGER_FILE_PATHS_EXCLUDED = ["**/*.md", "docs/**"]
+
+
+class PipelineCacheStack(Stack):
+    """CodeBuild cache bucket shared by every per-env pipeline (keys are prefixed per env)."""
+
+    def __init__(self, scope: Construct, construct_id: str) -> None:
+        super().__init__(scope, construct_id)
+
+        self.cache_bucket = s3.Bucket(
+            self,
+            "CodeBuildCacheBucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            versioned=False,
+            auto_delete_objects=False,
+            removal_policy=cdk.RemovalPolicy.RETAIN,
+            # Keyed venv tarballs are orphaned whenever requirements change; a still-current key
+            # that expires is simply rebuilt and re-uploaded on the next miss
+            lifecycle_rules=[s3.LifecycleRule(prefix="venv/", expiration=cdk.Duration.days(30))],
+        )
+
 
 class ToolsetPipelineStack(Stack):
     def __init__(
@@ -27,285 +203,226 @@ class ToolsetPipelineStack(Stack):
         github_branch: str,
         connection_arn: str | None,
         github_token_secret_name: str | None,
+        cache_bucket: s3.IBucket,
+        requirements_path: str = "requirements.txt",
+        smoke_path: str = "scripts/smoke_invoke.py",
     ) -> None:
         super().__init__(scope, construct_id)
 
-        cache_bucket = s3.Bucket(
-            self,
-            "CodeBuildCacheBucket",
-            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
-            encryption=s3.BucketEncryption.S3_MANAGED,
-            enforce_ssl=True,
-            versioned=False,
-            auto_delete_objects=False,
-            removal_policy=cdk.RemovalPolicy.RETAIN,
-        )
-
-        source_output = codepipeline.Artifact()
-        build_output = codepipeline.Artifact(artifact_name="SynthOutput")
+        # Named so the deploy buildspec can address it as $CODEBUILD_SRC_DIR_Source
+        source_output = codepipeline.Artifact(artifact_name="Source")
 
-        if connection_arn:
-            source_action = cpactions.CodeStarConnectionsSourceAction(
-                action_name="Source",
-                owner=github_owner,
-                repo=github_repo,
-                branch=github_branch,
-                connection_arn=connection_arn,
-                output=source_output,
-                trigger_on_push=True,
-            )
-        else:
-            if not github_token_secret_name:
-                raise ValueError("GitHub token Secrets Manager secret name must be provided when no CodeStar connection ARN is set")
-            source_action = cpactions.GitHubSourceAction(
-                action_name="Source",
+        def github_source(action_name: str, repo: str, output: codepipeline.Artifact, **connection_props: bool) -> codepipeline.IAction:
+            # One place decides between the CodeStar connection and the token webhook for every source action
+            if connection_arn:
+                return cpactions.CodeStarConnectionsSourceAction(
+                    action_name=action_name,
+                    owner=github_owner,
+                    repo=repo,
+                    branch=github_branch,
+                    connection_arn=connection_arn,
+                    output=output,
+                    trigger_on_push=True,
+                    **connection_props,
+                )
+            # build_pipelines has already checked a token secret is set when there is no connection
+            return cpactions.GitHubSourceAction(
+                action_name=action_name,
                 owner=github_owner,
-                repo=github_repo,
+                repo=repo,
                 branch=github_branch,
                 oauth_token=cdk.SecretValue.secrets_manager(github_token_secret_name),
-                output=source_output,
+                output=output,
                 trigger=cpactions.GitHubTrigger.WEBHOOK,
             )
 
+        # Full git clone (with .git) instead of a zipped snapshot; every consumer is a CodeBuild action
+        source_action = github_source("Source", github_repo, source_output, code_build_clone_output=True)
+
         client_source_output: Optional[codepipeline.Artifact] = None
-        client_source_action: Optional[cpactions.GitHubSourceAction] = None
+        client_source_action: Optional[codepipeline.IAction] = None
         if env_name in ("dev", "test"):
             client_source_output = codepipeline.Artifact(artifact_name="ClientSource")
-            if connection_arn:
-                client_source_action = cpactions.CodeStarConnectionsSourceAction(
-                    action_name="ClientSource",
-                    owner=github_owner,
-                    repo="toolforest_tools_client",
-                    branch=github_branch,
-                    connection_arn=connection_arn,
-                    output=client_source_output,
-                    trigger_on_push=True,
-                )  # type: ignore[assignment]
-            else:
-                client_source_action = cpactions.GitHubSourceAction(
-                    action_name="ClientSource",
-                    owner=github_owner,
-                    repo="toolforest_tools_client",
-                    branch=github_branch,
-                    oauth_token=cdk.SecretValue.secrets_manager(github_token_secret_name),
-                    output=client_source_output,
-                    trigger=cpactions.GitHubTrigger.WEBHOOK,
-                )
+            client_source_action = github_source("ClientSource", "toolforest_tools_client", client_source_output)
 
-        compute_type = codebuild.ComputeType.SMALL
-
-        test_buildspec = codebuild.BuildSpec.from_object(
-            {
-                "version": "0.2",
-                "phases": {
-                    "install": {
-                        "runtime-versions": {"python": "3.12", "nodejs": "20"},
-                        "commands": [
-                            "python3 -m venv .venv",
-                            ". .venv/bin/activate",
-                            "python -m pip install --upgrade pip",
-                            # Prefer main source requirements.txt
-                            "REPO_DIR=\"${CODEBUILD_SRC_DIR:-.}\"; REQ=\"$REPO_DIR/requirements.txt\"; if [ ! -f \"$REQ\" ]; then for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -f \"$d/requirements.txt\" ]; then REQ=\"$d/requirements.txt\"; break; fi; done; fi; if [ ! -f \"$REQ\" ]; then echo 'requirements.txt not found'; exit 1; fi; echo Using requirements at $REQ",
-                            "pip install -r \"$REQ\"",
-                            # Install client adapter from second source if present (branch-aligned)
-                            "CLIENT=\"\"; for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -d \"$d/src/mcp_server_adapter\" ]; then CLIENT=\"$d\"; break; fi; done; if [ -n \"$CLIENT\" ]; then echo \"Installing client from $CLIENT\"; pip install -e \"$CLIENT\"; else echo \"No client source found; using pinned adapter\"; fi",
-                            # Fallback network install (dev/test only) if needed
-                            "if [ -z \"$CLIENT\" ]; then pip install git+https://$GITHUB_PAT@github.com/primevalsoup/toolforest_tools_client.git@v0.3.1#egg=mcp-server-adapter || true; fi",
-                            "python -c \"import mcp_server_adapter; print('mcp_server_adapter OK')\"",
-                        ],
-                    },
-                    "build": {"commands": [". .venv/bin/activate && pytest -q toolsets"]},
-                },
+        def env_vars(**extra: str) -> dict[str, codebuild.BuildEnvironmentVariable]:
+            variables: dict[str, codebuild.BuildEnvironmentVariable] = {
+                "ENV": codebuild.BuildEnvironmentVariable(value=env_name),
+                "REQUIREMENTS_PATH": codebuild.BuildEnvironmentVariable(value=requirements_path),
+                "CACHE_BUCKET": codebuild.BuildEnvironmentVariable(value=cache_bucket.bucket_name),
+                "CB_CUSTOM_CACHE_DIR": codebuild.BuildEnvironmentVariable(value=_UV_CACHE_DIR),
             }
-        )
-
-        test_env_vars: dict[str, codebuild.BuildEnvironmentVariable] = {
-            "ENV": codebuild.BuildEnvironmentVariable(value=env_name),
-            "CB_CUSTOM_CACHE_DIR": codebuild.BuildEnvironmentVariable(value=".venv/.cache/pip"),
-        }
-        if github_token_secret_name:
-            test_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(
-                value=github_token_secret_name,
-                type=codebuild.BuildEnvironmentVariableType.SECRETS_MANAGER,
-            )
-        else:
-            test_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(value="")
-
-        test_project = codebuild.PipelineProject(
-            self,
-            "TestProject",
-            project_name=f"toolforest-tools-test-{env_name}",
-            environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.STANDARD_8_0,
-                privileged=True,
-                compute_type=compute_type,
-            ),
-            environment_variables=test_env_vars,
-            build_spec=test_buildspec,
-            cache=codebuild.Cache.local(codebuild.LocalCacheMode.CUSTOM),
-        )
+            if github_token_secret_name:
+                variables["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(
+                    value=github_token_secret_name,
+                    type=codebuild.BuildEnvironmentVariableType.SECRETS_MANAGER,
+                )
+            else:
+                variables["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(value="")
+            for name, value in extra.items():
+                variables[name] = codebuild.BuildEnvironmentVariable(value=value)
+            return variables
 
-        build_buildspec = codebuild.BuildSpec.from_object(
-            {
-                "version": "0.2",
-                "phases": {
-                    "install": {
-                        "runtime-versions": {"python": "3.12", "nodejs": "20"},
-                        "commands": [
-                            "python3 -m venv .venv",
-                            ". .venv/bin/activate",
-                            "python -m pip install --upgrade pip",
-                            # Prefer main source requirements.txt
-                            "REPO_DIR=\"${CODEBUILD_SRC_DIR:-.}\"; REQ=\"$REPO_DIR/requirements.txt\"; if [ ! -f \"$REQ\" ]; then for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -f \"$d/requirements.txt\" ]; then REQ=\"$d/requirements.txt\"; break; fi; done; fi; if [ ! -f \"$REQ\" ]; then echo 'requirements.txt not found'; exit 1; fi; echo Using requirements at $REQ",
-                            "pip install -r \"$REQ\"",
-                            # Optional: install client adapter if present for synth
-                            "CLIENT=\"\"; for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -d \"$d/src/mcp_server_adapter\" ]; then CLIENT=\"$d\"; break; fi; done; if [ -n \"$CLIENT\" ]; then pip install -e \"$CLIENT\"; else pip install git+https://$GITHUB_PAT@github.com/primevalsoup/toolforest_tools_client.git@v0.3.1#egg=mcp-server-adapter || true; fi",
-                            "npm install -g aws-cdk@2",
-                        ],
-                    },
-                    "build": {"commands": ["ENV=$ENV npx cdk synth"]},
-                },
-                "artifacts": {"files": ["cdk.out/**"]},
-            }
-        )
+        # Synth is CPU-bound (bundling, CDK/jsii); Deploy mostly waits on CloudFormation. Test runs on
+        # Graviton, whose ARM images only take SMALL/LARGE; pytest over the toolsets fits SMALL.
+        compute_type_medium = codebuild.ComputeType.MEDIUM
+        compute_type_small = codebuild.ComputeType.SMALL
+        # Build/Deploy image with the CDK CLI baked in; the layer is pulled instead of npm-installed per run
+        cdk_build_image = codebuild.LinuxBuildImage.from_asset(self, "CdkBuildImage", directory="pipeline/images/cdk")
+        owner = os.getenv("OWNER", "gerrit@toolforest.io")
 
-        build_env_vars: dict[str, codebuild.BuildEnvironmentVariable] = {
-            "ENV": codebuild.BuildEnvironmentVariable(value=env_name),
-            "CB_CUSTOM_CACHE_DIR": codebuild.BuildEnvironmentVariable(value=".venv/.cache/pip"),
-        }
-        if github_token_secret_name:
-            build_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(
-                value=github_token_secret_name,
-                type=codebuild.BuildEnvironmentVariableType.SECRETS_MANAGER,
+        def synth_cache() -> codebuild.Cache:
+            # Warm hosts keep the build image layers and the uv cache between runs.
+            # A project takes a single cache; the keyed venv in the bucket covers cold hosts.
+            return codebuild.Cache.local(
+                codebuild.LocalCacheMode.DOCKER_LAYER,
+                codebuild.LocalCacheMode.SOURCE,
+                codebuild.LocalCacheMode.CUSTOM,
             )
-        else:
-            build_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(value="")
 
-        build_project = codebuild.PipelineProject(
-            self,
-            "BuildProject",
-            project_name=f"toolforest-tools-build-{env_name}",
-            environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.STANDARD_8_0,
-                privileged=True,
-                compute_type=compute_type,
-            ),
-            environment_variables=build_env_vars,
-            build_spec=build_buildspec,
-            cache=codebuild.Cache.local(codebuild.LocalCacheMode.CUSTOM),
-        )
+        # Projects that deploy get admin; every project reads/writes the keyed venv tarballs under
+        # venv/, which Cache.bucket (scoped to the project cache prefix) does not grant
+        projects: list[codebuild.PipelineProject] = []
+        deploying_project: codebuild.PipelineProject
 
-        deploy_buildspec = codebuild.BuildSpec.from_object(
-            {
-                "version": "0.2",
-                "env": {"variables": {"CB_CUSTOM_CACHE_DIR": ".venv/.cache/pip"}},
-                "phases": {
-                    "install": {
-                        "runtime-versions": {"python": "3.12", "nodejs": "20"},
-                        "commands": [
-                            "python3 -m venv .venv",
-                            ". .venv/bin/activate",
-                            # Enforce PAT in prod
-                            "if [ \"$ENV\" = \"prod\" ] && [ -z \"$GITHUB_PAT\" ]; then echo 'GITHUB_PAT required in prod to install private adapter'; exit 1; fi",
-                            "python -m pip install --upgrade pip",
-                            # Prefer main source requirements.txt
-                            "REPO_DIR=\"${CODEBUILD_SRC_DIR:-.}\"; REQ=\"$REPO_DIR/requirements.txt\"; if [ ! -f \"$REQ\" ]; then for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -f \"$d/requirements.txt\" ]; then REQ=\"$d/requirements.txt\"; break; fi; done; fi; if [ ! -f \"$REQ\" ]; then REQ=$(find .. -maxdepth 4 -type f -name requirements.txt | head -n1 || true); fi; if [ ! -f \"$REQ\" ]; then echo 'requirements.txt not found in inputs'; exit 1; fi; echo Using requirements at $REQ",
-                            "pip install -r \"$REQ\"",
-                            # Install client adapter: dev/test prefer local ClientSource; prod uses pinned Git URL only
-                            "if [ \"$ENV\" != \"prod\" ]; then CLIENT_SRC=\"\"; for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do if [ -d \"$d/src/mcp_server_adapter\" ]; then CLIENT_SRC=\"$d\"; break; fi; done; if [ -n \"$CLIENT_SRC\" ]; then echo \"Installing client adapter from local source: $CLIENT_SRC\"; pip install -e \"$CLIENT_SRC\"; else echo \"Installing client adapter from pinned Git URL (non-prod)\"; pip install \"git+https://$GITHUB_PAT@github.com/primevalsoup/toolforest_tools_client.git@v0.3.1#egg=mcp-server-adapter\" || pip install \"git+https://github.com/primevalsoup/toolforest_tools_client.git@v0.3.1#egg=mcp-server-adapter\"; fi; else echo \"Installing client adapter from pinned Git URL (prod)\"; pip install \"git+https://$GITHUB_PAT@github.com/primevalsoup/toolforest_tools_client.git@v0.3.1#egg=mcp-server-adapter\"; fi",
-                            "python -c \"import mcp_server_adapter; print('mcp_server_adapter OK')\"",
-                            "npm install -g aws-cdk@2",
-                        ],
-                    },
-                    "build": {
-                        "commands": [
-                            "SMOKE=\"\"; for d in $(env | awk -F= '/^CODEBUILD_SRC_DIR_/ {print $2}'); do CAND=$(find \"$d\" -maxdepth 6 -type f -path '*/scripts/smoke_invoke.py' | head -n1 || true); if [ -n \"$CAND\" ]; then SMOKE=\"$CAND\"; break; fi; done; if [ -z \"$SMOKE\" ]; then echo 'smoke_invoke.py not found in inputs'; exit 1; fi; echo Using smoke at $SMOKE",
-                            "REPO_ROOT=$(dirname \"$(dirname \"$SMOKE\")\")",
-                            "echo Deploy from source using CDK app",
-                            "(cd \"$REPO_ROOT\" && ENV=$ENV OWNER=${OWNER:-pipeline@toolforest.io} npx cdk deploy --require-approval never)",
-                            "echo Smoke test for $ENV",
-                            ". .venv/bin/activate && if [ \"$ENV\" = \"prod\" ]; then export MCP_USER_JWT=test-jwt-abc.def.ghijklmnopqrstuvwxyz1234567890abcd; fi; ENV=$ENV python3 \"$SMOKE\"",
-                        ],
-                    },
-                },
-                "artifacts": {"files": ["cdk.out/**"]},
-            }
-        )
-
-        deploy_env_vars: dict[str, codebuild.BuildEnvironmentVariable] = {
-            "ENV": codebuild.BuildEnvironmentVariable(value=env_name),
-            "OWNER": codebuild.BuildEnvironmentVariable(value=os.getenv("OWNER", "gerrit@toolforest.io")),
-            "CB_CUSTOM_CACHE_DIR": codebuild.BuildEnvironmentVariable(value=".venv/.cache/pip"),
-        }
-        # Enforce GITHUB_PAT presence for prod; optional otherwise
         if env_name == "prod":
-            if not github_token_secret_name:
-                raise ValueError("GITHUB_TOKEN_SECRET_NAME must be set for prod to install private adapter")
-            deploy_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(
-                value=github_token_secret_name,
-                type=codebuild.BuildEnvironmentVariableType.SECRETS_MANAGER,
+            test_project = codebuild.PipelineProject(
+                self,
+                "TestProject",
+                project_name=f"toolforest-tools-test-{env_name}",
+                environment=codebuild.BuildEnvironment(
+                    # Tests are pure Python, so they run on cheaper/faster Graviton (SMALL, as ARM images
+                    # don't offer MEDIUM). Build and Deploy stay on x86_64: they bundle native wheels
+                    # (pydantic-core) for x86_64 Lambdas.
+                    build_image=codebuild.LinuxArmBuildImage.AMAZON_LINUX_2_STANDARD_3_0,
+                    # No Docker in pytest, so skip the Docker daemon startup
+                    privileged=False,
+                    compute_type=compute_type_small,
+                ),
+                environment_variables=env_vars(),
+                build_spec=codebuild.BuildSpec.from_object(_TEST_BUILDSPEC),
+                cache=codebuild.Cache.bucket(cache_bucket, prefix=f"toolforest/tools/test/{env_name}"),
             )
-            # Provide deterministic JWT for smoke assertion in prod
-            deploy_env_vars["MCP_USER_JWT"] = codebuild.BuildEnvironmentVariable(
-                value="test-jwt-abc.def.ghijklmnopqrstuvwxyz1234567890abcd",
+
+            build_project = codebuild.PipelineProject(
+                self,
+                "BuildProject",
+                project_name=f"toolforest-tools-build-{env_name}",
+                environment=codebuild.BuildEnvironment(
+                    build_image=cdk_build_image,
+                    # Synth keeps Docker for the shared deps layer's bundling fallback and the layer cache
+                    privileged=True,
+                    compute_type=compute_type_medium,
+                ),
+                environment_variables=env_vars(),
+                build_spec=codebuild.BuildSpec.from_object(_BUILD_BUILDSPEC),
+                cache=synth_cache(),
             )
+
+            deploy_project = codebuild.PipelineProject(
+                self,
+                "DeployProject",
+                project_name=f"toolforest-tools-deploy-{env_name}",
+                environment=codebuild.BuildEnvironment(
+                    build_image=cdk_build_image,
+                    # Deploys the already-bundled assembly from Build, so nothing runs in Docker
+                    privileged=False,
+                    compute_type=compute_type_small,
+                ),
+                # Provide deterministic JWT for smoke assertion in prod
+                environment_variables=env_vars(OWNER=owner, SMOKE_PATH=smoke_path, MCP_USER_JWT="test-jwt-abc.def.ghijklmnopqrstuvwxyz1234567890abcd"),
+                build_spec=codebuild.BuildSpec.from_object(_DEPLOY_BUILDSPEC),
+                cache=codebuild.Cache.bucket(cache_bucket, prefix=f"toolforest/tools/deploy/{env_name}"),
+            )
+            projects += [test_project, build_project, deploy_project]
+            deploying_project = deploy_project
+
+            build_output = codepipeline.Artifact(artifact_name="SynthOutput")
+            test_action = cpactions.CodeBuildAction(action_name=f"toolforest-tools-test-{env_name}", project=test_project, input=source_output)
+            build_action = cpactions.CodeBuildAction(action_name=f"toolforest-tools-build-{env_name}", project=build_project, input=source_output, outputs=[build_output])
+            deploy_action = cpactions.CodeBuildAction(action_name=f"toolforest-tools-deploy-{env_name}", project=deploy_project, input=build_output, extra_inputs=[source_output])
         else:
-            if github_token_secret_name:
-                deploy_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(
-                    value=github_token_secret_name,
-                    type=codebuild.BuildEnvironmentVariableType.SECRETS_MANAGER,
-                )
-            else:
-                deploy_env_vars["GITHUB_PAT"] = codebuild.BuildEnvironmentVariable(value="")
-            # Enforce strict JWT smoke assertion in non-prod envs
-            deploy_env_vars["STRICT_JWT"] = codebuild.BuildEnvironmentVariable(value="1")
+            ci_project = codebuild.PipelineProject(
+                self,
+                "CiProject",
+                project_name=f"toolforest-tools-ci-{env_name}",
+                environment=codebuild.BuildEnvironment(
+                    build_image=cdk_build_image,
+                    privileged=True,
+                    compute_type=compute_type_medium,
+                ),
+                # Enforce strict JWT smoke assertion in non-prod envs
+                environment_variables=env_vars(OWNER=owner, SMOKE_PATH=smoke_path, STRICT_JWT="1"),
+                build_spec=codebuild.BuildSpec.from_object(_CI_BUILDSPEC),
+                cache=synth_cache(),
+            )
+            projects.append(ci_project)
+            deploying_project = ci_project
 
-        deploy_project = codebuild.PipelineProject(
-            self,
-            "DeployProject",
-            project_name=f"toolforest-tools-deploy-{env_name}",
-            environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.STANDARD_8_0,
-                privileged=True,
-                compute_type=compute_type,
-            ),
-            environment_variables=deploy_env_vars,
-            build_spec=deploy_buildspec,
-            cache=codebuild.Cache.local(codebuild.LocalCacheMode.DOCKER_LAYER, codebuild.LocalCacheMode.CUSTOM),
-        )
+            # Client source (dev/test only) so install can use the branch-aligned adapter
+            ci_action = cpactions.CodeBuildAction(
+                action_name=f"toolforest-tools-ci-{env_name}",
+                project=ci_project,
+                input=source_output,
+                extra_inputs=[client_source_output] if client_source_output is not None else None,  # type: ignore[arg-type]
+            )
 
-        if deploy_project.role:
-            deploy_project.role.add_managed_policy(iam.ManagedPolicy.from_aws_managed_policy_name("AdministratorAccess"))
+        for project in projects:
+            cache_bucket.grant_read_write(project)
 
-        test_action = cpactions.CodeBuildAction(
-            action_name=f"toolforest-tools-test-{env_name}",
-            project=test_project,
-            input=source_output,
-            extra_inputs=[client_source_output] if client_source_output is not None else None,  # type: ignore[arg-type]
-        )
-        build_action = cpactions.CodeBuildAction(action_name=f"toolforest-tools-build-{env_name}", project=build_project, input=source_output, outputs=[build_output])
+        if deploying_project.role:
+            deploying_project.role.add_managed_policy(iam.ManagedPolicy.from_aws_managed_policy_name("AdministratorAccess"))
 
-        # Include client source artifact in deploy for dev/test so smoke/install can use it
-        deploy_extra_inputs = [source_output]
-        if client_source_output is not None:
-            deploy_extra_inputs.append(client_source_output)
-        deploy_action = cpactions.CodeBuildAction(action_name=f"toolforest-tools-deploy-{env_name}", project=deploy_project, input=build_output, extra_inputs=deploy_extra_inputs)
+        triggers: Optional[list[codepipeline.TriggerProps]] = None
+        if connection_arn:
+            triggers = [
+                codepipeline.TriggerProps(
+                    provider_type=codepipeline.ProviderType.CODE_STAR_SOURCE_CONNECTION,
+                    git_configuration=codepipeline.GitConfiguration(
+                        source_action=source_action,
+                        push_filter=[
+                            codepipeline.GitPushFilter(
+                                branches_includes=[github_branch],
+                                file_paths_includes=_TRIGGER_FILE_PATHS,
+                                file_paths_excludes=_TRIGGER_FILE_PATHS_EXCLUDED,
+                            )
+                        ],
+                    ),
+                )
+            ]
+            if client_source_action is not None:
+                # Any adapter change on the aligned branch is relevant, so only the branch is filtered
+                triggers.append(
+                    codepipeline.TriggerProps(
+                        provider_type=codepipeline.ProviderType.CODE_STAR_SOURCE_CONNECTION,
+                        git_configuration=codepipeline.GitConfiguration(
+                            source_action=client_source_action,
+                            push_filter=[codepipeline.GitPushFilter(branches_includes=[github_branch])],
+                        ),
+                    )
+                )
 
-        pipeline = codepipeline.Pipeline(self, "Pipeline", pipeline_name=f"toolforest-tools-pipeline-{env_name}", pipeline_type=codepipeline.PipelineType.V2)
+        pipeline = codepipeline.Pipeline(
+            self,
+            "Pipeline",
+            pipeline_name=f"toolforest-tools-pipeline-{env_name}",
+            pipeline_type=codepipeline.PipelineType.V2,
+            triggers=triggers,
+        )
 
         if client_source_action is not None:
             pipeline.add_stage(stage_name=f"toolforest-tools-source-{env_name}", actions=[source_action, client_source_action])
         else:
             pipeline.add_stage(stage_name=f"toolforest-tools-source-{env_name}", actions=[source_action])
 
-        pipeline.add_stage(stage_name=f"toolforest-tools-test-{env_name}", actions=[test_action])
-        pipeline.add_stage(stage_name=f"toolforest-tools-build-{env_name}", actions=[build_action])
-
         if env_name == "prod":
+            # Test and synth both read only the source, so they run as parallel actions (same run_order)
+            pipeline.add_stage(stage_name=f"toolforest-tools-test-build-{env_name}", actions=[test_action, build_action])
             approval = cpactions.ManualApprovalAction(action_name=f"toolforest-tools-approve-{env_name}")
             pipeline.add_stage(stage_name=f"toolforest-tools-approve-{env_name}", actions=[approval])
-
-        pipeline.add_stage(stage_name=f"toolforest-tools-deploy-{env_name}", actions=[deploy_action])
+            pipeline.add_stage(stage_name=f"toolforest-tools-deploy-{env_name}", actions=[deploy_action])
+        else:
+            pipeline.add_stage(stage_name=f"toolforest-tools-ci-{env_name}", actions=[ci_action])
 
 
 def build_pipelines(app: cdk.App) -> None:
@@ -323,6 +440,16 @@ def build_pipelines(app: cdk.App) -> None:
         "main": "prod",
     }
 
+    # Validate once up front so a misconfiguration fails before any stack is constructed
+    if not connection_arn and not github_token_secret_name:
+        raise ValueError("GitHub token Secrets Manager secret name must be provided when no CodeStar connection ARN is set")
+    # Enforce GITHUB_PAT presence for prod; optional otherwise
+    if "prod" in mappings.values() and not github_token_secret_name:
+        raise ValueError("GITHUB_TOKEN_SECRET_NAME must be set for prod to install private adapter")
+
+    # One cache bucket for all env pipelines instead of one per stack
+    cache_stack = PipelineCacheStack(app, "Toolforest-Toolsets-PipelineCache")
+
     for branch, env_name in mappings.items():
         ToolsetPipelineStack(
             app,
@@ -333,4 +460,5 @@ def build_pipelines(app: cdk.App) -> None:
             github_branch=branch,
             connection_arn=connection_arn,
             github_token_secret_name=github_token_secret_name,
+            cache_bucket=cache_stack.cache_bucket,
         )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import aws_cdk as cdk
+import jsii
+from aws_cdk import (
+    Stack,
+    aws_lambda as _lambda,
+    aws_ssm as ssm,
+)
+from constructs import Construct
+
+PYDANTIC_LAYER_DIR = Path("layers/pydantic")
+# pip's wheel cache when the layer is installed with pip (uv keeps its own, honouring UV_CACHE_DIR)
+_PIP_CACHE_DIR = Path(os.getenv("TOOLFOREST_PIP_CACHE", Path.home() / ".cache" / "toolforest-pip"))
+
+
+def deps_layer_parameter_name(env_name: str) -> str:
+    """SSM parameter holding the shared deps layer ARN, keyed by the pinned requirements.
+
+    Keying the name by content means a dependency bump changes every consuming function's
+    template, so each publishes a new version instead of leaving aliases on the old layer.
+    """
+    digest = hashlib.sha256((PYDANTIC_LAYER_DIR / "requirements.txt").read_bytes()).hexdigest()[:12]
+    return f"/toolforest/{env_name}/layers/pydantic-{digest}"
+
+
+@jsii.implements(cdk.ILocalBundling)
+class _LocalLayerBundling:
+    """pip-install the layer requirements on the host, skipping the Docker container."""
+
+    def try_bundle(self, output_dir: str, *, image: cdk.DockerImage, **_kwargs) -> bool:
+        if os.getenv("TOOLFOREST_DOCKER_BUNDLING") == "1":
+            return False
+        target = str(Path(output_dir) / "python")
+        requirements = str(PYDANTIC_LAYER_DIR / "requirements.txt")
+        # Resolve Lambda-compatible (x86_64 manylinux) wheels regardless of the host platform.
+        # The repo's venvs are uv venvs, which ship without pip, so uv is preferred.
+        uv = shutil.which("uv")
+        if uv:
+            cmd = [
+                uv, "pip", "install", "--quiet",
+                "--target", target,
+                "--python-platform", "x86_64-manylinux2014",
+                "--python-version", "3.12",
+                "--only-binary", ":all:",
+                "-r", requirements,
+            ]
+        elif importlib.util.find_spec("pip") is not None:
+            cmd = [
+                sys.executable, "-m", "pip", "install",
+                "--quiet", "--disable-pip-version-check", "--no-compile",
+                "--cache-dir", str(_PIP_CACHE_DIR),
+                "--target", target,
+                "--platform", "manylinux2014_x86_64",
+                "--implementation", "cp",
+                "--python-version", "3.12",
+                "--only-binary=:all:",
+                "-r", requirements,
+            ]
+        else:
+            print("Neither uv nor pip is available; bundling the deps layer with Docker", file=sys.stderr)
+            return False
+        try:
+            subprocess.run(cmd, check=True)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            print(f"Local deps layer install failed ({exc}); bundling with Docker", file=sys.stderr)
+            return False
+        return True
+
+
+class SharedDepsStack(Stack):
+    """Third-party dependencies shared by every toolset function, published once as a layer."""
+
+    def __init__(self, scope: Construct, construct_id: str, *, env_name: str, default_tags: Dict[str, str]) -> None:
+        super().__init__(scope, construct_id)
+
+        for k, v in default_tags.items():
+            cdk.Tags.of(self).add(k, v)
+
+        layer = _lambda.LayerVersion(
+            self,
+            "PydanticLayer",
+            code=_lambda.Code.from_asset(
+                path=str(PYDANTIC_LAYER_DIR),
+                bundling=cdk.BundlingOptions(
+                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+                    command=[
+                        "bash", "-lc",
+                        "pip install --no-cache-dir --no-compile -r /asset-input/requirements.txt -t /asset-output/python",
+                    ],
+                    local=_LocalLayerBundling(),
+                ),
+            ),
+            compatible_runtimes=[_lambda.Runtime.PYTHON_3_12],
+            compatible_architectures=[_lambda.Architecture.X86_64],
+            description="pydantic for toolforest toolset functions",
+            # Published function versions keep referencing the layer version they were built with
+            removal_policy=cdk.RemovalPolicy.RETAIN,
+        )
+
+        # Consumers resolve the ARN through SSM rather than a CloudFormation export, so replacing
+        # the layer version never blocks on an export that is still imported
+        ssm.StringParameter(
+            self,
+            "PydanticLayerArn",
+            parameter_name=deps_layer_parameter_name(env_name),
+            string_value=layer.layer_version_arn,
+        )
+        cdk.CfnOutput(self, "PydanticLayerVersionArn", value=layer.layer_version_arn)
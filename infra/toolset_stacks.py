@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import shutil
 from pathlib import Path
 from typing import Dict
 
 import aws_cdk as cdk
+import jsii
+import yaml
 from aws_cdk import (
     Stack,
     aws_iam as iam,
@@ -15,15 +19,52 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from infra.shared_deps_stack import PYDANTIC_LAYER_DIR, SharedDepsStack, deps_layer_parameter_name
+
+# libyaml's C parser when PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_RUNTIME_SRC = Path("packages/mcp-lambda-runtime/src/mcp_lambda_runtime")
+# Fingerprints of the last successfully deployed toolsets; only scripts/deploy.sh writes it, by
+# promoting the candidate file a skip-mode synth leaves in the cloud assembly
+_SYNTH_CACHE = Path(".cdk.toolforest.cache.json")
+_PENDING_FINGERPRINTS = "toolforest-fingerprints.json"
+# Content outside the toolset dir that still changes its template or code: the bundled runtime,
+# the stack definitions, the layer pins (in the layer parameter name) and the aws-cdk-lib pin
+_SHARED_FINGERPRINT_INPUTS = (
+    _RUNTIME_SRC,
+    Path("infra"),
+    PYDANTIC_LAYER_DIR / "requirements.txt",
+    Path("requirements.txt"),
+)
+
+
+@jsii.implements(cdk.ILocalBundling)
+class _LocalToolsetBundling:
+    """Bundle a toolset on the host, skipping the per-stack Docker container."""
+
+    def __init__(self, toolset_src: Path) -> None:
+        self._toolset_src = toolset_src
+
+    def try_bundle(self, output_dir: str, *, image: cdk.DockerImage, **_kwargs) -> bool:
+        if os.getenv("TOOLFOREST_DOCKER_BUNDLING") == "1":
+            return False
+        out = Path(output_dir)
+        ignore = shutil.ignore_patterns("__pycache__", "*.pyc")
+        try:
+            shutil.copytree(self._toolset_src, out, dirs_exist_ok=True, ignore=ignore)
+            shutil.copytree(_RUNTIME_SRC, out / "mcp_lambda_runtime", dirs_exist_ok=True, ignore=ignore)
+        except OSError:
+            # Fall back to the Docker bundling command
+            return False
+        return True
+
 
 class ToolsetStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, *, toolset_dir: Path, env_name: str, default_tags: Dict[str, str]) -> None:
         super().__init__(scope, construct_id)
 
         with open(toolset_dir / "toolset.yaml", "r", encoding="utf-8") as f:
-            import yaml
-
-            cfg = yaml.safe_load(f)
+            cfg = yaml.load(f, Loader=_YamlLoader)
 
         name = cfg["name"]
         function_name = f"toolforest-tool-{name}-{env_name}"
@@ -56,46 +97,55 @@ class ToolsetStack(Stack):
         for action in permissions:
             role.add_to_policy(iam.PolicyStatement(actions=[action], resources=["*"]))
 
-        # Layers
-        layer_objs = [
+        # Layers: pydantic comes from the shared deps layer, so bundling is a plain file copy
+        deps_layer_arn = ssm.StringParameter.value_for_string_parameter(self, deps_layer_parameter_name(env_name))
+        layer_objs = [_lambda.LayerVersion.from_layer_version_arn(self, "DepsLayer", deps_layer_arn)] + [
             _lambda.LayerVersion.from_layer_version_arn(self, f"Layer{i}", arn)
             for i, arn in enumerate(layers_arn)
         ]
 
-        # Bundle function code with runtime and minimal deps
+        # Bundle function code with the runtime package
         bundle_cmd = (
             f"set -euo pipefail; "
             f"mkdir -p /asset-output; "
             f"cp -r /asset-input/toolsets/{name}/src/* /asset-output/; "
             f"mkdir -p /asset-output/mcp_lambda_runtime; "
-            f"cp -r /asset-input/packages/mcp-lambda-runtime/src/mcp_lambda_runtime/* /asset-output/mcp_lambda_runtime/; "
-            f"pip install --no-cache-dir -t /asset-output pydantic==2.8.2"
+            f"cp -r /asset-input/packages/mcp-lambda-runtime/src/mcp_lambda_runtime/* /asset-output/mcp_lambda_runtime/"
         )
 
+        # Pipelines zip every toolset in one pass (scripts/bundle_toolsets.py) before synth
+        bundle_dir = os.getenv("TOOLFOREST_BUNDLE_DIR")
+        prebuilt_zip = Path(bundle_dir) / f"{toolset_dir.name}.zip" if bundle_dir else None
+        if prebuilt_zip is not None and prebuilt_zip.is_file():
+            code = _lambda.Code.from_asset(str(prebuilt_zip))
+        else:
+            code = _lambda.Code.from_asset(
+                path=".",
+                bundling=cdk.BundlingOptions(
+                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
+                    command=["bash", "-lc", bundle_cmd],
+                    local=_LocalToolsetBundling(toolset_dir / "src"),
+                ),
+            )
+
         fn = _lambda.Function(
             self,
             "Function",
             function_name=function_name,
             runtime=_lambda.Runtime.PYTHON_3_12,
             handler=handler,
-            code=_lambda.Code.from_asset(
-                path=".",
-                bundling=cdk.BundlingOptions(
-                    image=_lambda.Runtime.PYTHON_3_12.bundling_image,
-                    command=["bash", "-lc", bundle_cmd],
-                ),
-            ),
+            code=code,
             role=role,
             memory_size=memory,
             timeout=cdk.Duration.seconds(timeout),
-            environment={"ENV": env_name, **env_vars},
+            environment={"ENV": env_name, **({} if env_name == "prod" else {"MCP_STRICT_RESULT_TYPES": "1"}), **env_vars},
             layers=layer_objs,
             architecture=_lambda.Architecture.X86_64,
         )
 
         version = fn.current_version
         alias = _lambda.Alias(self, "Alias", alias_name=env_name, version=version)
-        alias_arn = cdk.Fn.sub("${FnArn}:${Alias}", {"FnArn": fn.function_arn, "Alias": env_name})
+        alias_arn = f"{fn.function_arn}:{env_name}"
 
         # Alarms
         if alarms:
@@ -119,17 +169,19 @@ class ToolsetStack(Stack):
                     evaluation_periods=1,
                 )
 
-        # Registry write to SSM as a JSON string
-        registry_str = cdk.Fn.sub(
-            '{"toolset_id":"${ToolsetId}","name":"${Name}","lambda_function_arn":"${FnArn}","alias":"${Env}","alias_arn":"${AliasArn}","version":"${Version}","manifest_version":""}',
+        # Registry write to SSM as a JSON string; synth-time values are inlined and only the
+        # function ARN and version stay as tokens (rendered as a single Fn::Join)
+        registry_str = json.dumps(
             {
-                "ToolsetId": toolset_id,
-                "Name": name,
-                "FnArn": fn.function_arn,
-                "Env": env_name,
-                "AliasArn": alias_arn,
-                "Version": version.version,
+                "toolset_id": toolset_id,
+                "name": name,
+                "lambda_function_arn": fn.function_arn,
+                "alias": env_name,
+                "alias_arn": alias_arn,
+                "version": version.version,
+                "manifest_version": "",
             },
+            separators=(",", ":"),
         )
         registry_param = ssm.StringParameter(
             self,
@@ -141,16 +193,71 @@ class ToolsetStack(Stack):
         registry_param.node.add_dependency(alias)
 
 
+def _hash_inputs(h: hashlib.blake2b, root: Path) -> None:
+    paths = sorted(root.rglob("*")) if root.is_dir() else [root]
+    for path in paths:
+        if not path.is_file() or "__pycache__" in path.parts or path.suffix == ".pyc":
+            continue
+        data = path.read_bytes()
+        h.update(f"{path.as_posix()}\0{len(data)}\n".encode("utf-8"))
+        h.update(data)
+
+
+def _shared_fingerprint() -> str:
+    """Hash the inputs every toolset stack shares: runtime package, infra code, pinned requirements."""
+    h = hashlib.blake2b(digest_size=16)
+    for root in _SHARED_FINGERPRINT_INPUTS:
+        _hash_inputs(h, root)
+    return h.hexdigest()
+
+
+def _toolset_fingerprint(toolset_dir: Path, shared: str) -> str:
+    """Hash the contents of every file a toolset's stack is built from."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(shared.encode("utf-8"))
+    _hash_inputs(h, toolset_dir)
+    return h.hexdigest()
+
+
+def _load_synth_cache() -> Dict[str, str]:
+    try:
+        with open(_SYNTH_CACHE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
 def build_toolset_stacks(*, app: cdk.App, env_name: str, default_tags: Dict[str, str]) -> None:
+    shared_deps = SharedDepsStack(app, f"Toolforest-SharedDeps-{env_name}", env_name=env_name, default_tags=default_tags)
     toolsets_root = Path("toolsets")
+    # Local inner loop only: leave toolsets whose inputs are unchanged since the last deploy out of
+    # the app, so `cdk deploy --all` touches just the edited ones. Pipelines always synth everything.
+    skip_unchanged = os.getenv("TOOLFOREST_SKIP_UNCHANGED") == "1"
+    deployed = _load_synth_cache() if skip_unchanged else {}
+    shared = _shared_fingerprint() if skip_unchanged else ""
+    pending = dict(deployed)
     for toolset_dir in toolsets_root.iterdir():
         if not (toolset_dir / "toolset.yaml").exists():
             continue
         name = toolset_dir.name
-        ToolsetStack(
+        if skip_unchanged:
+            cache_key = f"{env_name}/{name}"
+            fingerprint = _toolset_fingerprint(toolset_dir, shared)
+            if deployed.get(cache_key) == fingerprint:
+                continue
+            pending[cache_key] = fingerprint
+        stack = ToolsetStack(
             app,
             f"Toolset-{name}-{env_name}",
             toolset_dir=toolset_dir,
             env_name=env_name,
             default_tags=default_tags,
         )
+        # The layer ARN parameter must exist before a toolset stack resolves it
+        stack.add_dependency(shared_deps)
+    if skip_unchanged:
+        # Candidate only: becomes the cache once the deploy of this assembly succeeds
+        out = Path(app.outdir)
+        out.mkdir(parents=True, exist_ok=True)
+        with open(out / _PENDING_FINGERPRINTS, "w", encoding="utf-8") as f:
+            json.dump(pending, f, indent=2, sort_keys=True)
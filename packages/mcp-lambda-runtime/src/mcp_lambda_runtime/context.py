@@ -1,24 +1,26 @@
 from __future__ import annotations
 
-from contextvars import ContextVar
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class RequestContext:
     user_jwt: str = ""
 
 
-_current_context: ContextVar[RequestContext] = ContextVar("mcp_lambda_request_context", default=RequestContext())
+# A Lambda container serves one invocation at a time, so a plain module global is enough;
+# handler() replaces it at the start of every request
+_current_context: RequestContext = RequestContext()
 
 
 def set_request_context(ctx: RequestContext) -> None:
-    _current_context.set(ctx)
+    global _current_context
+    _current_context = ctx
 
 
 def get_request_context() -> RequestContext:
-    return _current_context.get()
+    return _current_context
 
 
 def get_user_jwt() -> str:
-    return _current_context.get().user_jwt
+    return _current_context.user_jwt
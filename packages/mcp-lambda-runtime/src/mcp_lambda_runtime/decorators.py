@@ -5,22 +5,33 @@ from typing import Any, Callable, Dict, Optional, Type, get_type_hints
 
 from pydantic import BaseModel
 
-from .registry import ToolRegistry, ToolSpec
+from .registry import ToolSpec, registry
 
 
-def tool(func: Optional[Callable[..., Any]] = None, *, name: Optional[str] = None) -> Callable[..., Any]:
+def tool(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    name: Optional[str] = None,
+    fastpath: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+) -> Callable[..., Any]:
     """
     Decorator to register a tool function with typed params/result using Pydantic models.
 
     The function must have the signature: (params: BaseModel) -> BaseModel
+
+    ``fastpath`` optionally takes the raw params dict and returns the dumped result directly,
+    skipping both model constructions. It must return None for any input it does not fully
+    validate itself, so the handler falls back to the Pydantic path.
     """
 
     def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
-        registry = ToolRegistry.instance()
         tool_name = name or f.__name__
 
-        # Resolve annotations to actual types (handles postponed annotations)
-        hints = get_type_hints(f, globalns=f.__globals__, localns=None)
+        # Postponed (string) annotations need resolving against the module globals; modules
+        # without `from __future__ import annotations` already hand over the model classes
+        hints = getattr(f, "__annotations__", {})
+        if any(isinstance(v, str) for v in hints.values()):
+            hints = get_type_hints(f, globalns=f.__globals__, localns=None)
         params_model = hints.get("params")
         result_model = hints.get("return")
 
@@ -35,6 +46,8 @@ def tool(func: Optional[Callable[..., Any]] = None, *, name: Optional[str] = Non
             params_model=params_model,  # type: ignore[arg-type]
             result_model=result_model,  # type: ignore[arg-type]
             func=f,
+            # Schemas are generated on the first describe_tools, keeping invoke-only cold starts free of it
+            fastpath=fastpath,
         )
         registry.register(spec)
 
@@ -7,9 +7,19 @@ from typing import Any, Dict
 
 from pydantic import BaseModel, ValidationError
 
-from .registry import ToolRegistry
+from .registry import registry
 from .context import RequestContext, set_request_context
 
+# Fixed for the lifetime of the Lambda process, so read once at import
+ENV = os.getenv("ENV", "dev")
+# @tool already checks result annotations at import; the per-call type check is opt-in (dev/test)
+_STRICT = os.getenv("MCP_STRICT_RESULT_TYPES") == "1"
+_LOG_PREFIX = f'{{"level":"INFO","env":{json.dumps(ENV)},"event":"lambda_request","duration_ms":'
+# Tools are static for the life of the container, so the manifest is versioned once per cold start
+# unless the deployment pins a version
+_MANIFEST_VERSION = os.getenv("MANIFEST_VERSION") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+_manifest: Dict[str, Any] | None = None
+
 
 class RpcError(Exception):
     def __init__(self, error_type: str, message: str) -> None:
@@ -25,9 +35,8 @@ def _response(result: Dict[str, Any] | None = None, error: Dict[str, str] | None
 
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    start = time.time()
-    env = os.getenv("ENV", "dev")
-    registry = ToolRegistry.instance()
+    global _manifest
+    start_ns = time.perf_counter_ns()
 
     # Extract optional auth context
     user_jwt = ""
@@ -40,13 +49,15 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         action = event.get("action")
         if action == "describe_tools":
             desc = registry.describe()
-            manifest = {
-                "toolset": registry.toolset_name or "unknown",
-                "toolset_version": registry.toolset_version or "0.0.0",
-                "manifest_version": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                "tools": desc,
-            }
-            return _response(manifest)
+            # Rebuilt only when the registry's descriptions were reset by a new registration
+            if _manifest is None or _manifest["tools"] is not desc:
+                _manifest = {
+                    "toolset": registry.toolset_name or "unknown",
+                    "toolset_version": registry.toolset_version or "0.0.0",
+                    "manifest_version": _MANIFEST_VERSION,
+                    "tools": desc,
+                }
+            return _response(_manifest)
 
         if action == "invoke":
             method = event.get("method")
@@ -56,12 +67,17 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             raw_params = event.get("params", {})
             if not isinstance(raw_params, dict):
                 raise RpcError("BadRequest", "'params' must be an object")
+            if spec.fastpath is not None:
+                fast_result = spec.fastpath(raw_params)
+                if fast_result is not None:
+                    return _response(fast_result)
             try:
-                params_model: BaseModel = spec.params_model(**raw_params)
+                # Validate the dict directly in pydantic-core instead of round-tripping through kwargs
+                params_model: BaseModel = spec.params_model.model_validate(raw_params)
             except ValidationError as ve:
                 raise RpcError("ValidationError", ve.json())
             result_model: BaseModel = spec.func(params_model)
-            if not isinstance(result_model, spec.result_model):
+            if _STRICT and not isinstance(result_model, spec.result_model):
                 raise RpcError("InternalError", "Tool returned wrong result type")
             return _response(result_model.model_dump())
 
@@ -72,16 +88,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     except Exception as e:  # noqa: BLE001
         return _response(error={"type": "InternalError", "message": str(e)})
     finally:
-        duration_ms = int((time.time() - start) * 1000)
+        duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        # Fixed-schema log line rendered from a template; only the action goes through json
         print(
-            json.dumps(
-                {
-                    "level": "INFO",
-                    "env": env,
-                    "event": "lambda_request",
-                    "duration_ms": duration_ms,
-                    "action": event.get("action"),
-                    "has_user_jwt": bool(user_jwt),
-                }
-            )
+            f'{_LOG_PREFIX}{duration_ms},"action":{json.dumps(event.get("action"))},'
+            f'"has_user_jwt":{"true" if user_jwt else "false"}}}'
         )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import re
+import string
 from typing import Annotated
 
 from pydantic import StringConstraints
@@ -10,8 +10,18 @@ JWT_REGEX_STRICT_LEN = r"^[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{
 
 JwtTokenStr = Annotated[str, StringConstraints(pattern=JWT_REGEX_STRICT_LEN)]
 
-_jwt_re = re.compile(JWT_REGEX_STRICT_LEN)
+# Deletes every base64url character, so a well-formed segment translates to ""
+_STRIP_BASE64URL = str.maketrans("", "", string.ascii_letters + string.digits + "_-")
 
 
 def is_jwt_format(token: str) -> bool:
-    return bool(_jwt_re.match(token or ""))
+    # Same rules as JWT_REGEX_STRICT_LEN, checked with split + translate instead of the regex engine
+    if not token:
+        return False
+    parts = token.split(".")
+    if len(parts) != 3:
+        return False
+    header, payload, signature = parts
+    if len(header) < 10 or len(payload) < 10 or len(signature) < 32:
+        return False
+    return not (header + payload + signature).translate(_STRIP_BASE64URL)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Type
+from typing import Any, Callable, Dict, List, Optional, Type
 
 from pydantic import BaseModel
 
@@ -13,46 +13,57 @@ class ToolSpec:
     params_model: Type[BaseModel]
     result_model: Type[BaseModel]
     func: Callable[..., Any]
+    # JSON schemas are immutable once the models are defined; computed once, on first describe
+    params_schema: Optional[Dict[str, Any]] = None
+    result_schema: Optional[Dict[str, Any]] = None
+    # Optional raw-dict shortcut: returns the result dict, or None to take the validated path
+    fastpath: Optional[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = None
 
 
 class ToolRegistry:
-    _instance: "ToolRegistry" | None = None
-
     def __init__(self) -> None:
         self._tools: Dict[str, ToolSpec] = {}
         self.toolset_name: str | None = None
         self.toolset_version: str | None = None
+        self._descriptions: List[Dict[str, Any]] | None = None
 
     @classmethod
     def instance(cls) -> "ToolRegistry":
-        if cls._instance is None:
-            cls._instance = ToolRegistry()
-        return cls._instance
+        return registry
 
     def register(self, spec: ToolSpec) -> None:
         if spec.name in self._tools:
             raise ValueError(f"Tool '{spec.name}' already registered")
         self._tools[spec.name] = spec
+        self._descriptions = None
 
     def describe(self) -> List[Dict[str, Any]]:
+        # Warm invocations reuse the descriptions built on the first describe; register() resets them
+        if self._descriptions is not None:
+            return self._descriptions
         descriptions: List[Dict[str, Any]] = []
         for spec in self._tools.values():
-            params_schema = spec.params_model.model_json_schema()
-            result_schema = spec.result_model.model_json_schema()
+            if spec.params_schema is None:
+                spec.params_schema = spec.params_model.model_json_schema()
+            if spec.result_schema is None:
+                spec.result_schema = spec.result_model.model_json_schema()
             descriptions.append(
                 {
                     "name": spec.name,
                     "doc": spec.doc,
-                    "params_schema": params_schema,
-                    "result_schema": result_schema,
+                    "params_schema": spec.params_schema,
+                    "result_schema": spec.result_schema,
                 }
             )
+        self._descriptions = descriptions
         return descriptions
 
     def get_tool(self, name: str) -> ToolSpec:
-        if name not in self._tools:
-            raise KeyError(name)
         return self._tools[name]
 
     def list_names(self) -> List[str]:
         return list(self._tools.keys())
+
+
+# Process-wide registry; tools register into it at import time
+registry = ToolRegistry()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import sys
+import zipfile
+from pathlib import Path
+from typing import Iterator, Tuple
+
+TOOLSETS_ROOT = Path("toolsets")
+RUNTIME_SRC = Path("packages/mcp-lambda-runtime/src/mcp_lambda_runtime")
+# Fixed entry timestamp so unchanged sources produce byte-identical zips (and unchanged CDK asset hashes)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def iter_files(root: Path, prefix: str = "") -> Iterator[Tuple[Path, str]]:
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or "__pycache__" in path.parts or path.suffix == ".pyc":
+            continue
+        yield path, f"{prefix}{path.relative_to(root).as_posix()}"
+
+
+def bundle_toolset(toolset_dir: Path, out_dir: Path) -> Path:
+    """Zip a toolset's src/ plus the runtime package, laid out as the Lambda code root."""
+    zip_path = out_dir / f"{toolset_dir.name}.zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path, arcname in [*iter_files(toolset_dir / "src"), *iter_files(RUNTIME_SRC, "mcp_lambda_runtime/")]:
+            info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+            info.external_attr = 0o644 << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, path.read_bytes())
+    return zip_path
+
+
+def main() -> None:
+    out_dir = Path(sys.argv[1] if len(sys.argv) > 1 else os.getenv("TOOLFOREST_BUNDLE_DIR", "dist"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for toolset_dir in sorted(TOOLSETS_ROOT.iterdir()):
+        if not (toolset_dir / "toolset.yaml").exists():
+            continue
+        print(f"Bundled {bundle_toolset(toolset_dir, out_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,4 +14,10 @@ uv venv --python 3.12
 . .venv/bin/activate
 uv pip install -r requirements.txt
 
-ENV="$ENV" OWNER="$OWNER" npx cdk deploy --require-approval never
+ENV="$ENV" OWNER="$OWNER" npx cdk deploy --all --concurrency 4 --require-approval never
+
+# Skip mode (TOOLFOREST_SKIP_UNCHANGED=1): record what was just deployed so the next run can
+# leave unchanged toolsets out; reached only when the deploy succeeded (set -e)
+if [ "${TOOLFOREST_SKIP_UNCHANGED:-0}" = "1" ] && [ -f cdk.out/toolforest-fingerprints.json ]; then
+  cp cdk.out/toolforest-fingerprints.json .cdk.toolforest.cache.json
+fi
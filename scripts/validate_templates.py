@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 ALLOWED_RUNTIME = {"python3.12"}
 MAX_TIMEOUT = 30
@@ -12,60 +13,72 @@ MAX_MEMORY = 1024
 REQUIRED_TAGS = {"toolset_id", "owner", "env"}
 GATE_TAG_KEY = "toolforest-tools"
 GATE_TAG_VALUE = "1"
+# A gated template necessarily contains the tag key as a JSON string literal
+_GATE_TAG_LITERAL = json.dumps(GATE_TAG_KEY).encode("utf-8")
 
 
 def has_gate_tag(template: Dict[str, Any]) -> bool:
     # Stack-level tags are not directly in the template; approximate by checking resource tags on the Function
-    resources = template.get("Resources", {})
-    for res in resources.values():
-        props = res.get("Properties", {})
-        tags = props.get("Tags")
-        if isinstance(tags, list):
-            kv = {t.get("Key"): t.get("Value") for t in tags if isinstance(t, dict)}
-            if kv.get(GATE_TAG_KEY) == GATE_TAG_VALUE:
-                return True
-    return False
+    return any(
+        isinstance(t, dict) and t.get("Key") == GATE_TAG_KEY and t.get("Value") == GATE_TAG_VALUE
+        for res in template.get("Resources", {}).values()
+        if isinstance(tags := res.get("Properties", {}).get("Tags"), list)
+        for t in tags
+    )
 
 
 def validate_template(path: Path) -> None:
-    with path.open("r", encoding="utf-8") as f:
-        template = json.load(f)
+    data = path.read_bytes()
+    # Ungated stacks (pipelines, hooks) are skipped without being parsed
+    if _GATE_TAG_LITERAL not in data:
+        return
+    template = json.loads(data)
 
     if not has_gate_tag(template):
         return
 
     resources = template.get("Resources", {})
+    # One pass splits out functions (with their tag maps) and aliases
+    functions = []
+    aliases = []
     for name, res in resources.items():
         rtype = res.get("Type")
         props = res.get("Properties", {})
         if rtype == "AWS::Lambda::Function":
-            runtime = props.get("Runtime")
-            if runtime not in ALLOWED_RUNTIME:
-                raise SystemExit(f"{path.name}: Function {name} runtime {runtime} not allowed")
-            timeout = int(props.get("Timeout", 0))
-            memory = int(props.get("MemorySize", 0))
-            if timeout > MAX_TIMEOUT:
-                raise SystemExit(f"{path.name}: Function {name} timeout {timeout}s exceeds {MAX_TIMEOUT}s")
-            if memory > MAX_MEMORY:
-                raise SystemExit(f"{path.name}: Function {name} memory {memory}MB exceeds {MAX_MEMORY}MB")
-            tags = props.get("Tags", [])
-            present = {t.get("Key"): t.get("Value") for t in tags if isinstance(t, dict)}
-            missing = [t for t in REQUIRED_TAGS if t not in present]
-            if missing:
-                raise SystemExit(f"{path.name}: Function {name} missing required tags: {missing}")
-        if rtype == "AWS::Lambda::Alias":
-            alias_name = props.get("Name")
-            # Find env tag from any function
-            env = None
-            for r2 in resources.values():
-                if r2.get("Type") == "AWS::Lambda::Function":
-                    tags = r2.get("Properties", {}).get("Tags", [])
-                    present = {t.get("Key"): t.get("Value") for t in tags if isinstance(t, dict)}
-                    env = present.get("env")
-                    if env:
-                        break
-            if env and alias_name != env:
-                raise SystemExit(f"{path.name}: Alias {name} name {alias_name} must equal env {env}")
+            present = {t.get("Key"): t.get("Value") for t in props.get("Tags", []) if isinstance(t, dict)}
+            functions.append((name, props, present))
+        elif rtype == "AWS::Lambda::Alias":
+            aliases.append((name, props))
+
+    for name, props, present in functions:
+        runtime = props.get("Runtime")
+        if runtime not in ALLOWED_RUNTIME:
+            raise SystemExit(f"{path.name}: Function {name} runtime {runtime} not allowed")
+        timeout = int(props.get("Timeout", 0))
+        memory = int(props.get("MemorySize", 0))
+        if timeout > MAX_TIMEOUT:
+            raise SystemExit(f"{path.name}: Function {name} timeout {timeout}s exceeds {MAX_TIMEOUT}s")
+        if memory > MAX_MEMORY:
+            raise SystemExit(f"{path.name}: Function {name} memory {memory}MB exceeds {MAX_MEMORY}MB")
+        missing = [t for t in REQUIRED_TAGS if t not in present]
+        if missing:
+            raise SystemExit(f"{path.name}: Function {name} missing required tags: {missing}")
+
+    # Env tag from the first function that has one, shared by every alias check
+    env = next((present["env"] for _, _, present in functions if present.get("env")), None)
+    for name, props in aliases:
+        alias_name = props.get("Name")
+        if env and alias_name != env:
+            raise SystemExit(f"{path.name}: Alias {name} name {alias_name} must equal env {env}")
+
+
+def _check_template(path: Path) -> Optional[str]:
+    """Validate one template in a worker process, returning the failure message instead of exiting."""
+    try:
+        validate_template(path)
+    except SystemExit as e:
+        return str(e.code)
+    return None
 
 
 def main() -> None:
@@ -74,9 +87,16 @@ def main() -> None:
     if not out.exists():
         raise SystemExit("cdk.out not found; run synth first")
 
-    # Validate all templates in cdk.out
-    for p in out.glob("*.template.json"):
-        validate_template(p)
+    # Validate all templates in cdk.out; templates are independent, so spread them across cores
+    paths = sorted(out.glob("*.template.json"))
+    if len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+            failures = [msg for msg in pool.map(_check_template, paths) if msg is not None]
+        if failures:
+            raise SystemExit("\n".join(failures))
+    else:
+        for p in paths:
+            validate_template(p)
 
     print("Template validation passed")
 
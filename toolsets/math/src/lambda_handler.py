@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
 
 from mcp_lambda_runtime import handler as runtime_handler
 from mcp_lambda_runtime import tool, ToolRegistry
@@ -8,25 +10,47 @@ from mcp_lambda_runtime.context import get_user_jwt
 
 
 class AddParams(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     x: float = Field(..., description="First addend")
     y: float = Field(..., description="Second addend")
 
 
 class AddResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     value: float = Field(..., description="Sum")
 
 
-@tool
+_NUMBER_TYPES = (int, float)
+
+
+def _add_raw(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Exactly two plain JSON numbers (bool excluded); anything else goes through AddParams
+    x = params.get("x")
+    y = params.get("y")
+    if len(params) == 2 and type(x) in _NUMBER_TYPES and type(y) in _NUMBER_TYPES:
+        try:
+            return {"value": float(x) + float(y)}
+        except OverflowError:
+            # Ints beyond float range; AddParams reports them as a validation error
+            return None
+    return None
+
+
+@tool(fastpath=_add_raw)
 def add(params: AddParams) -> AddResult:
     """Add two numbers."""
     return AddResult(value=params.x + params.y)
 
 
 class WhoAmIParams(BaseModel):
-    pass
+    model_config = ConfigDict(frozen=True, extra="forbid")
 
 
 class WhoAmIResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     user_jwt: str = Field("", description="Propagated user JWT from MCP context")
 
 
@@ -36,9 +60,13 @@ def whoami(params: WhoAmIParams) -> WhoAmIResult:
     return WhoAmIResult(user_jwt=get_user_jwt())
 
 
-# Initialize registry metadata
-ToolRegistry.instance().toolset_name = "math"
-ToolRegistry.instance().toolset_version = "0.1.0"
+TOOLSET_NAME = "math"
+TOOLSET_VERSION = "0.1.0"
+
+# Initialize registry metadata; runs once per container, warm invocations reuse the module
+_registry = ToolRegistry.instance()
+_registry.toolset_name = TOOLSET_NAME
+_registry.toolset_version = TOOLSET_VERSION
 
 
 def handler(event, context):  # AWS entrypoint
@@ -1,19 +1,28 @@
 from __future__ import annotations
 
+from typing import Any, Dict
+
+import pytest
+
+from mcp_lambda_runtime import ToolRegistry
 from toolsets.math.src.lambda_handler import AddParams, AddResult, add, handler
 
 
+@pytest.fixture(scope="session")
+def describe_response() -> Dict[str, Any]:
+    # One describe_tools call (which builds the schemas) shared by every describe assertion
+    return handler({"action": "describe_tools"}, None)
+
+
 def test_add_unit():
     result = add(AddParams(x=1, y=2))
     assert isinstance(result, AddResult)
     assert result.value == 3
 
 
-def test_describe_tools_contract():
-    event = {"action": "describe_tools"}
-    resp = handler(event, None)
-    assert "result" in resp
-    tools = resp["result"]["tools"]
+def test_describe_tools_contract(describe_response):
+    assert "result" in describe_response
+    tools = describe_response["result"]["tools"]
     names = {t["name"] for t in tools}
     assert "add" in names
 
@@ -22,3 +31,47 @@ def test_invoke_contract():
     event = {"action": "invoke", "method": "add", "params": {"x": 2, "y": 5}}
     resp = handler(event, None)
     assert resp.get("result") == {"value": 7}
+
+
+def test_describe_tools_schemas(describe_response):
+    tools = {t["name"]: t for t in describe_response["result"]["tools"]}
+    assert tools["add"]["params_schema"] == AddParams.model_json_schema()
+    assert tools["add"]["result_schema"] == AddResult.model_json_schema()
+
+
+def test_invoke_rejects_unknown_params():
+    event = {"action": "invoke", "method": "add", "params": {"x": 2, "y": 5, "z": 1}}
+    resp = handler(event, None)
+    assert resp["error"]["type"] == "ValidationError"
+
+
+def test_invoke_fastpath_matches_validated_path():
+    for params in ({"x": 2, "y": 5}, {"x": 1.5, "y": "2.5"}):
+        resp = handler({"action": "invoke", "method": "add", "params": params}, None)
+        expected = add(AddParams.model_validate(params)).model_dump()
+        assert resp == {"result": expected}
+
+
+def test_invoke_fastpath_defers_float_overflow():
+    event = {"action": "invoke", "method": "add", "params": {"x": 10**400, "y": 1}}
+    resp = handler(event, None)
+    assert resp["error"]["type"] == "ValidationError"
+
+
+def test_add_models_resolved_from_postponed_annotations():
+    assert add.__wrapped__.__annotations__ == {"params": "AddParams", "return": "AddResult"}
+    spec = ToolRegistry.instance().get_tool("add")
+    assert spec.params_model is AddParams
+    assert spec.result_model is AddResult
+
+
+def test_invoke_takes_fastpath(monkeypatch):
+    spec = ToolRegistry.instance().get_tool("add")
+    assert spec.fastpath is not None
+
+    def validated_path(_params):
+        raise AssertionError("plain numeric params must not reach the Pydantic path")
+
+    monkeypatch.setattr(spec, "func", validated_path)
+    resp = handler({"action": "invoke", "method": "add", "params": {"x": 2, "y": 40}}, None)
+    assert resp == {"result": {"value": 42.0}}